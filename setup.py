@@ -56,7 +56,7 @@ config = {
     'version': VERSION,
     'url': 'https://github.com/tensorly/tensorly-torch',
     'download_url': 'https://github.com/tensorly/tensorly-torch/tarball/' + VERSION,
-    'install_requires': ['numpy', 'scipy', 'nose'],
+    'install_requires': ['numpy', 'scipy', 'nose', 'opt_einsum'],
     'license': 'Modified BSD',
     'scripts': [],
     'classifiers': [
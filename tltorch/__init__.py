@@ -9,6 +9,6 @@ from . import factorized_layers
 from .factorized_layers import FactorizedLinear, FactorizedConv, TRL, TCL, FactorizedEmbedding
 from .factorized_tensors import FactorizedTensor, CPTensor, TTTensor, TuckerTensor, tensor_init
 from .factorized_tensors import (TensorizedTensor, CPTensorized, BlockTT,
-                                  TuckerTensorized)
+                                  TuckerTensorized, set_block_tt_compile)
 from .tensor_hooks import (tensor_lasso, remove_tensor_lasso,
                            tensor_dropout, remove_tensor_dropout)
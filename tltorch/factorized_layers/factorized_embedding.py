@@ -1,3 +1,4 @@
+import math
 import torch
 import numpy as np
 from torch import nn
@@ -49,8 +50,8 @@ class FactorizedEmbedding(nn.Module):
 
         else:
             #check that dimensions match factorization
-            computed_num_embeddings = np.prod(tensorized_num_embeddings)
-            computed_embedding_dim = np.prod(tensorized_embedding_dim)
+            computed_num_embeddings = math.prod(tensorized_num_embeddings)
+            computed_embedding_dim = math.prod(tensorized_embedding_dim)
 
             if computed_num_embeddings!=num_embeddings:
                 raise ValueError("Tensorized embeddding number {} does not match num_embeddings argument {}".format(computed_num_embeddings,num_embeddings))
@@ -41,8 +41,8 @@ class FactorizedLinear(nn.Module):
         if factorization == 'TTM' and n_layers != 1:
             raise ValueError(f'TTM factorization only support single factorized layers but got n_layers={n_layers}.')
 
-        self.in_features = np.prod(in_tensorized_features)
-        self.out_features = np.prod(out_tensorized_features)
+        self.in_features = math.prod(in_tensorized_features)
+        self.out_features = math.prod(out_tensorized_features)
         self.in_tensorized_features = in_tensorized_features
         self.out_tensorized_features = out_tensorized_features
         self.tensorized_shape = out_tensorized_features + in_tensorized_features
@@ -132,8 +132,8 @@ class FactorizedLinear(nn.Module):
         bias : bool, default is True
         """
         out_features, in_features = linear.weight.shape
-        assert(out_features == np.prod(out_tensorized_features))
-        assert(in_features == np.prod(in_tensorized_features))
+        assert(out_features == math.prod(out_tensorized_features))
+        assert(in_features == math.prod(in_tensorized_features))
 
         instance = cls(in_tensorized_features, out_tensorized_features, bias=bias,
                        factorization=factorization, rank=rank, n_layers=1,
@@ -168,8 +168,8 @@ class FactorizedLinear(nn.Module):
 
         for linear in linear_list:
             out_features, in_features = linear.weight.shape
-            assert(out_features == np.prod(out_tensorized_features))
-            assert(in_features == np.prod(in_tensorized_features))
+            assert(out_features == math.prod(out_tensorized_features))
+            assert(in_features == math.prod(in_tensorized_features))
 
         instance = cls(in_tensorized_features, out_tensorized_features, bias=bias,
                        factorization=factorization, rank=rank, n_layers=len(linear_list),
@@ -55,3 +55,12 @@ def test_FactorizedEmbedding(factorization,dims):
     normal_embed = test_embedding(batch)
     factorized_embed = factorized_embedding(batch)
     testing.assert_array_almost_equal(normal_embed.shape,factorized_embed.shape,decimal=2)
+
+
+@pytest.mark.parametrize('factorization', ['CP', 'BlockTT'])
+def test_FactorizedEmbedding_out_of_bounds(factorization):
+    """Out of range tokens must raise instead of wrapping around to other embeddings"""
+    factorized_embedding = FactorizedEmbedding(100, 16, factorization=factorization)
+
+    with pytest.raises((IndexError, RuntimeError)):
+        factorized_embedding(torch.tensor([100]))
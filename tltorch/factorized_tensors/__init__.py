@@ -1,5 +1,5 @@
 from .factorized_tensors import (CPTensor, TuckerTensor, TTTensor,
                                 FactorizedTensor)
 from .tensorized_matrices import (TensorizedTensor, CPTensorized, BlockTT,
-                                  TuckerTensorized)
+                                  TuckerTensorized, set_block_tt_compile)
 from .init import tensor_init, cp_init, tucker_init, tt_init, block_tt_init
\ No newline at end of file
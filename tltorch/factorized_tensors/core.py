@@ -1,10 +1,11 @@
 from tltorch.factorized_tensors.init import tensor_init
 import warnings
+import itertools
+import math
 
 import tensorly as tl
 tl.set_backend('pytorch')
 from torch import nn
-import numpy as np
 
 # Author: Jean Kossaifi
 # License: BSD 3 clause
@@ -301,7 +302,7 @@ class FactorizedTensor(nn.Module, metaclass=MetaFactorizedTensor):
         return len(self.shape)
 
     def numel(self):
-        return int(np.prod(self.shape))
+        return math.prod(self.shape)
 
     @property
     def ndim(self):
@@ -510,6 +511,29 @@ class TensorizedTensor(FactorizedTensor, metaclass=MetaFactorizedTensor, name=''
         tensor = matrix.reshape((*batch_dims, *tensorized_row_shape, *tensorized_column_shape))
         return cls.from_tensor(tensor, batch_dims + (tensorized_row_shape, tensorized_column_shape), rank, factorization=factorization, **kwargs)
 
+    @property
+    def _tensorized_strides(self):
+        """The strides of the sub-modes of each tensorized mode (None for regular modes)
+
+        Computed on first access, and recomputed only if `tensorized_shape` changes.
+        """
+        cache = self.__dict__.get('_tensorized_strides_cache')
+        if cache is None or cache[0] != self.tensorized_shape:
+            strides = [None if isinstance(s, int) else tuple(math.prod(s[i+1:]) for i in range(len(s)))
+                       for s in self.tensorized_shape]
+            cache = self._tensorized_strides_cache = (self.tensorized_shape, strides)
+        return cache[1]
+
+    @property
+    def _factors_list(self):
+        """The factors as a plain list, read directly from the FactorList
+
+        The list is built on each access, so that it always reflects the current parameters:
+        read it once rather than inside loops.
+        """
+        factors = self.factors
+        return [getattr(factors, key) for key in factors.keys]
+
     def to_matrix(self):
         """Reconstruct the full matrix from the factorized tensorization
 
@@ -521,7 +545,7 @@ class TensorizedTensor(FactorizedTensor, metaclass=MetaFactorizedTensor, name=''
     
     @property
     def tensor_shape(self):
-        return sum([(e,) if isinstance(e, int) else tuple(e) for e in self.tensorized_shape], ())
+        return tuple(itertools.chain.from_iterable((e,) if isinstance(e, int) else e for e in self.tensorized_shape))
 
     def init_from_matrix(self, matrix, **kwargs):
         tensor = matrix.reshape(self.tensor_shape)
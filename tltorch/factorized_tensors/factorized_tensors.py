@@ -1,5 +1,5 @@
 import math
-from collections import Iterable
+from collections.abc import Iterable
 
 import numpy as np
 import torch
@@ -230,11 +230,11 @@ class TuckerTensor(FactorizedTensor, name='Tucker'):
                 # Initialise with 1/shape[mode] or given value
                 for mode in unsqueezed_modes:
                     size = self.shape[mode]
-                    factor = torch.ones(size, 1)
                     if unsqueezed_init == 'average':
-                        factor /= size
+                        value = 1/size
                     else:
-                        factor *= unsqueezed_init
+                        value = unsqueezed_init
+                    factor = torch.full((size, 1), value, device=core.device, dtype=core.dtype)
                     factors.insert(mode, factor)
                     core = core.unsqueeze(mode)
 
@@ -253,7 +253,7 @@ class TuckerTensor(FactorizedTensor, name='Tucker'):
         if mean != 0:
             raise ValueError(f'Currently only mean=0 is supported, but got mean={mean}')
             
-        r = np.prod([math.sqrt(r) for r in self.rank])
+        r = math.prod([math.sqrt(r) for r in self.rank])
         std_factors = (std/r)**(1/(self.order+1))
         
         with torch.no_grad():
@@ -357,7 +357,7 @@ class TTTensor(FactorizedTensor, name='TT'):
         if mean != 0:
             raise ValueError(f'Currently only mean=0 is supported, but got mean={mean}')
 
-        r = np.prod(self.rank)
+        r = math.prod(self.rank)
         std_factors = (std/r)**(1/self.order)
         with torch.no_grad():
             for factor in self.factors:
@@ -6,7 +6,6 @@
 
 import torch
 import math
-import numpy as np
 
 import tensorly as tl
 tl.set_backend('pytorch')
@@ -68,7 +67,7 @@ def tucker_init(tucker_tensor, std=0.02):
     """
     order = tucker_tensor.order
     rank = tucker_tensor.rank
-    r = np.prod([math.sqrt(r) for r in rank])
+    r = math.prod([math.sqrt(r) for r in rank])
     std_factors = (std/r)**(1/(order+1))
     with torch.no_grad():
         tucker_tensor.core.normal_(0, std_factors)
@@ -90,7 +89,7 @@ def tt_init(tt_tensor, std=0.02):
     We assume the given factors form a correct TT decomposition, no checks are done here.
     """
     order = tt_tensor.order
-    r = np.prod(tt_tensor.rank)
+    r = math.prod(tt_tensor.rank)
     std_factors = (std/r)**(1/order)
     with torch.no_grad():
         for factor in tt_tensor.factors:
@@ -1,10 +1,12 @@
 import math
-from collections import Iterable
+import itertools
+import functools
 import warnings
 
 import numpy as np
 import torch
 from torch import nn
+import opt_einsum as oe
 
 import tensorly as tl
 tl.set_backend('pytorch')
@@ -18,23 +20,72 @@ from ..utils.parameter_list import FactorList
 einsum_symbols = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ"
 einsum_symbols_set = set(einsum_symbols)
 
+# If True, the BlockTT contractions are compiled with torch.compile
+# Set it with set_block_tt_compile
+_COMPILE_ENABLED = False
+
+# Types of indices that index several modes at once
+_INDEX_ITER_TYPES = (list, tuple)
+
 
 # Author: Jean Kossaifi
 # License: BSD 3 clause
 
 def is_tensorized_shape(shape):
     """Checks if a given shape represents a tensorized tensor."""
-    if all(isinstance(s, int) for s in shape):
-        return False
-    return True
+    return any(not isinstance(s, int) for s in shape)
+
+def _unravel_index(index, shape, strides, device=None):
+    """Converts flat indices into a tuple of indices, one for each mode of shape
+
+    Equivalent to np.unravel_index, but the indices stay in a torch tensor on `device`.
+
+    Parameters
+    ----------
+    index : int or list or torch.Tensor
+        flat indices into an array of shape `shape`
+    shape : tuple[int]
+    strides : tuple[int]
+        strides of each mode of `shape`, as given by `TensorizedTensor._tensorized_strides`
+    device : torch.device, optional
+        device on which to create the indices if they are not already a tensor
+
+    Returns
+    -------
+    tuple
+        tuple of indices (int or 1D tensors) of length len(shape)
+
+    Notes
+    -----
+    Negative indices are counted from the end. Out of bounds indices are not wrapped:
+    the index of the leading sub-mode is then out of bounds too, and indexing the factors with it raises.
+    """
+    size = strides[0]*shape[0]
+    if isinstance(index, (np.integer, int)):
+        if not -size <= index < size:
+            raise IndexError(f'index {index} is out of bounds for a tensorized mode of size {size}.')
+        if index < 0:
+            index += size
+    else:
+        index = torch.as_tensor(index, dtype=torch.long, device=device)
+        index = torch.where(index < 0, index + size, index)
+
+    leading_index = index // strides[0]
+    return (leading_index, ) + tuple((index // stride) % dim for stride, dim in zip(strides[1:], shape[1:]))
+
+def _scalar_index(index):
+    """Returns 0-d tensors and arrays as python scalars, so that they index like integers"""
+    if (torch.is_tensor(index) or isinstance(index, np.ndarray)) and index.ndim == 0:
+        return index.item()
+    return index
 
 def tensorized_shape_to_shape(tensorized_shape):
-    return [s if isinstance(s, int) else np.prod(s) for s in tensorized_shape]
+    return [s if isinstance(s, int) else math.prod(s) for s in tensorized_shape]
 
 class CPTensorized(CPTensor, TensorizedTensor, name='CP'):
     
     def __init__(self, weights, factors, tensorized_shape, rank=None):
-        tensor_shape = sum([(e,) if isinstance(e, int) else tuple(e) for e in tensorized_shape], ())
+        tensor_shape = tuple(itertools.chain.from_iterable((e,) if isinstance(e, int) else e for e in tensorized_shape))
 
         super().__init__(weights, factors, tensor_shape, rank)
 
@@ -46,7 +97,7 @@ class CPTensorized(CPTensor, TensorizedTensor, name='CP'):
 
     @classmethod
     def new(cls, tensorized_shape, rank, device=None, dtype=None, **kwargs):
-        flattened_tensorized_shape = sum([[e] if isinstance(e, int) else list(e) for e in tensorized_shape], [])
+        flattened_tensorized_shape = list(itertools.chain.from_iterable((e,) if isinstance(e, int) else e for e in tensorized_shape))
         rank = tl.cp_tensor.validate_cp_rank(flattened_tensorized_shape, rank)
 
         # Register the parameters
@@ -69,21 +120,27 @@ class CPTensorized(CPTensor, TensorizedTensor, name='CP'):
                    tensorized_shape, rank=rank)
 
     def __getitem__(self, indices):
-        if not isinstance(indices, Iterable):
+        if not isinstance(indices, _INDEX_ITER_TYPES):
             indices = [indices]
 
+        if all(isinstance(index, slice) and index == slice(None) for index in indices):
+            # Keeping all indices (:) of every mode, nothing to index
+            return self
+
         output_shape = []
         indexed_factors = []
-        factors = self.factors
+        factors = self._factors_list
         weights = self.weights
+        scaling = [] # rows of the factors indexed with an integer, to be multiplied with the weights
         
-        for (index, shape) in zip(indices, self.tensorized_shape):
+        for (index, shape, strides) in zip(indices, self.tensorized_shape, self._tensorized_strides):
+            index = _scalar_index(index)
             if isinstance(shape, int):
                 # We are indexing a "regular" mode
                 factor, *factors = factors
                 
                 if isinstance(index, (np.integer, int)):
-                    weights = weights*factor[index, :]
+                    scaling.append(factor[index, :])
                 else:
                     factor = factor[index, :]
                     indexed_factors.append(factor)
@@ -92,7 +149,7 @@ class CPTensorized(CPTensor, TensorizedTensor, name='CP'):
             else: 
                 # We are indexing a tensorized mode
                 
-                if index == slice(None) or index == ():
+                if (isinstance(index, slice) and index == slice(None)) or (isinstance(index, tuple) and not index):
                     # Keeping all indices (:)
                     indexed_factors.extend(factors[:len(shape)])
                     output_shape.append(shape)
@@ -100,38 +157,43 @@ class CPTensorized(CPTensor, TensorizedTensor, name='CP'):
                 else:
                     if isinstance(index, slice):
                         # Since we've already filtered out :, this is a partial slice
-                        # Convert into list
+                        # Convert into a tensor of indices
                         max_index = math.prod(shape)
-                        index = list(range(*index.indices(max_index)))
+                        index = torch.arange(*index.indices(max_index), device=factors[0].device)
 
-                    if isinstance(index, Iterable):
+                    if not isinstance(index, (np.integer, int)):
                         output_shape.append(len(index))
 
-                    index = np.unravel_index(index, shape)
+                    index = _unravel_index(index, shape, strides, device=factors[0].device)
                     # Index the whole tensorized shape, resulting in a single factor
-                    factor = 1
-                    for idx, ff in zip(index, factors[:len(shape)]):
-                        factor *= ff[idx, :]
+                    gathered = [ff.index_select(0, idx) if torch.is_tensor(idx) else ff[idx, :]
+                                for idx, ff in zip(index, factors[:len(shape)])]
 
-                    if tl.ndim(factor) == 2:
-                        indexed_factors.append(factor)
+                    if gathered[0].ndim == 1:
+                        scaling.extend(gathered)
+                    elif len(gathered) > 1:
+                        indexed_factors.append(torch.stack(gathered, dim=0).prod(dim=0))
                     else:
-                        weights = weights*factor
+                        indexed_factors.append(gathered[0])
 
                 factors = factors[len(shape):]
         
         indexed_factors.extend(factors)
         output_shape.extend(self.tensorized_shape[len(indices):])
+
+        if scaling:
+            # Multiply all the indexed rows with the weights at once
+            weights = torch.stack([weights, *scaling], dim=0).prod(dim=0)
         
         if indexed_factors:
             return self.__class__(weights, indexed_factors, tensorized_shape=output_shape)
-        return tl.sum(weights)
+        return torch.sum(weights)
 
 
 class TuckerTensorized(TensorizedTensor, TuckerTensor, name='Tucker'):
     
     def __init__(self, core, factors, tensorized_shape, rank=None):
-        tensor_shape = sum([(e,) if isinstance(e, int) else tuple(e) for e in tensorized_shape], ())
+        tensor_shape = tuple(itertools.chain.from_iterable((e,) if isinstance(e, int) else e for e in tensorized_shape))
 
         super().__init__(core, factors, tensor_shape, rank)
 
@@ -141,7 +203,7 @@ class TuckerTensorized(TensorizedTensor, TuckerTensor, name='Tucker'):
 
     @classmethod
     def new(cls, tensorized_shape, rank, device=None, dtype=None, **kwargs):
-        tensor_shape = sum([(e,) if isinstance(e, int) else tuple(e) for e in tensorized_shape], ())
+        tensor_shape = tuple(itertools.chain.from_iterable((e,) if isinstance(e, int) else e for e in tensorized_shape))
         rank = tl.tucker_tensor.validate_tucker_rank(tensor_shape, rank)
 
         # Register the parameters
@@ -163,6 +225,10 @@ class TuckerTensorized(TensorizedTensor, TuckerTensor, name='Tucker'):
                    tensorized_shape, rank=rank)
 
     def __getitem__(self, indices):
+        if not isinstance(indices, _INDEX_ITER_TYPES):
+            indices = [indices]
+
+        factors = self._factors_list
         counter = 0
         ndim = self.core.ndim
         new_ndim = 0
@@ -172,12 +238,13 @@ class TuckerTensorized(TensorizedTensor, TuckerTensor, name='Tucker'):
 
         core = self.core
         
-        for (index, shape) in zip(indices, self.tensorized_shape):
+        for (index, shape, strides) in zip(indices, self.tensorized_shape, self._tensorized_strides):
+            index = _scalar_index(index)
             if isinstance(shape, int):
                 if index is Ellipsis:
                     raise ValueError(f'Ellipsis is not yet supported, yet got indices={indices}, indices[{i}]={index}.')
-                factor = self.factors[counter]
-                if isinstance(index, int):
+                factor = factors[counter]
+                if isinstance(index, (np.integer, int)):
                     core = tenalg.mode_dot(core, factor[index, :], new_ndim)
                 else:
                     contracted = factor[index, :]
@@ -192,8 +259,8 @@ class TuckerTensorized(TensorizedTensor, TuckerTensor, name='Tucker'):
             else: # Tensorized dimension
                 n_tensorized_modes = len(shape)
 
-                if index == slice(None) or index == ():
-                    new_factors.extend(self.factors[counter:counter+n_tensorized_modes])
+                if (isinstance(index, slice) and index == slice(None)) or (isinstance(index, tuple) and not index):
+                    new_factors.extend(factors[counter:counter+n_tensorized_modes])
                     out_shape.append(shape)
                     new_modes.extend([new_ndim+i for i in range(n_tensorized_modes)])
                     new_ndim += n_tensorized_modes
@@ -201,13 +268,14 @@ class TuckerTensorized(TensorizedTensor, TuckerTensor, name='Tucker'):
                 else:
                     if isinstance(index, slice):
                         # Since we've already filtered out :, this is a partial slice
-                        # Convert into list
+                        # Convert into a tensor of indices
                         max_index = math.prod(shape)
-                        index = list(range(*index.indices(max_index)))
+                        index = torch.arange(*index.indices(max_index), device=core.device)
                     
-                    index = np.unravel_index(index, shape)
+                    index = _unravel_index(index, shape, strides, device=core.device)
                     
-                    contraction_factors = [f[idx, :] for idx, f in zip(index, self.factors[counter:counter+n_tensorized_modes])]
+                    contraction_factors = [f.index_select(0, idx) if torch.is_tensor(idx) else f[idx, :]
+                                           for idx, f in zip(index, factors[counter:counter+n_tensorized_modes])]
                     if contraction_factors[0].ndim > 1:
                         shared_symbol = einsum_symbols[core.ndim+1]
                     else:
@@ -232,7 +300,7 @@ class TuckerTensorized(TensorizedTensor, TuckerTensor, name='Tucker'):
         if counter <= ndim:
             out_shape.extend(list(core.shape[new_ndim:]))
             new_modes.extend(list(range(new_ndim, core.ndim)))
-            new_factors.extend(self.factors[counter:])
+            new_factors.extend(factors[counter:])
 
         # Only here until our Tucker class handles partial-Tucker too
         if len(new_modes) != core.ndim:
@@ -245,15 +313,119 @@ class TuckerTensorized(TensorizedTensor, TuckerTensor, name='Tucker'):
 
         return core
 
-def validate_block_tt_rank(tensorized_shape, rank):
+def _block_tt_mode_shapes(tensorized_shape):
+    """Returns, for each mode, its size in each of the BlockTT factors"""
     ndim = max([1 if isinstance(s, int) else len(s) for s in tensorized_shape])
-    factor_shapes = [(s, )*ndim if isinstance(s, int) else s for s in tensorized_shape]
-    factor_shapes = list(math.prod(e) for e in zip(*factor_shapes))
+    return [(s, )*ndim if isinstance(s, int) else s for s in tensorized_shape]
+
+def validate_block_tt_rank(tensorized_shape, rank, mode_shapes=None):
+    if mode_shapes is None:
+        mode_shapes = _block_tt_mode_shapes(tensorized_shape)
+    factor_shapes = list(math.prod(e) for e in zip(*mode_shapes))
 
     return tl.tt_tensor.validate_tt_rank(factor_shapes, rank)
 
+def _block_tt_equation(n_factors, contraction_op):
+    """Returns the equation contracting all the factors of a BlockTT at once
+
+    Parameters
+    ----------
+    n_factors : int
+        number of factors, each of shape (rank_k, dim_0, ..., dim_N, rank_{k+1})
+    contraction_op : list of {'b', 'm'}
+        for each dimension dim_i, either
+            i. 'b' (batched): the dimension is shared by all the factors
+        or ii. 'm' (multiply): the output dimension is the product of the factors' dimensions
+
+    Returns
+    -------
+    str
+        einsum equation, the output only contains the dimensions dim_i
+        (the sub-modes of the multiplied dimensions still need to be folded with a reshape)
+    """
+    # Symbols 0..n_factors are the ranks, followed by the symbols of the dimensions
+    counter = n_factors + 1
+    in_eqs = [[oe.get_symbol(i)] for i in range(n_factors)]
+    out_eq = []
+    for op in contraction_op:
+        if op == 'b':
+            symbol = oe.get_symbol(counter)
+            counter += 1
+            for in_eq in in_eqs:
+                in_eq.append(symbol)
+            out_eq.append(symbol)
+        else:
+            for in_eq in in_eqs:
+                symbol = oe.get_symbol(counter)
+                counter += 1
+                in_eq.append(symbol)
+                out_eq.append(symbol)
+    for i, in_eq in enumerate(in_eqs):
+        in_eq.append(oe.get_symbol(i + 1))
+
+    return ','.join(''.join(in_eq) for in_eq in in_eqs) + '->' + ''.join(out_eq)
+
+@functools.lru_cache(maxsize=128)
+def _compile_contraction(equation):
+    """Returns the contraction of `equation`, compiled with torch.compile
+
+    A single function is compiled per equation, with dynamic shapes,
+    so e.g. a varying number of indices does not trigger a new compilation.
+    """
+    def contract(*factors):
+        return torch.einsum(equation, *factors)
+
+    return torch.compile(contract, dynamic=True)
+
+def set_block_tt_compile(enabled=True):
+    """Sets whether the contractions of BlockTT tensors are compiled with torch.compile
+
+    Compilation requires PyTorch >= 2.0. It is disabled by default,
+    as it has a significant upfront cost and is only worth it for large tensors used repeatedly.
+
+    Parameters
+    ----------
+    enabled : bool, default is True
+    """
+    global _COMPILE_ENABLED
+    if enabled and not hasattr(torch, 'compile'):
+        raise RuntimeError(f'Compiling the contractions requires PyTorch >= 2.0, but got version {torch.__version__}.')
+    _COMPILE_ENABLED = enabled
+
+@functools.lru_cache(maxsize=128)
+def _contract_expression(equation, shapes, optimize='auto'):
+    """Returns the (cached) expression contracting tensors of the given shapes
+
+    The contraction path is only searched the first time an (equation, shapes) pair is seen.
+    Only the most recently used expressions are kept, e.g. for the varying number of indices
+    when indexing a tensorized embedding.
+
+    Parameters
+    ----------
+    equation : str
+        einsum equation
+    shapes : tuple of tuple[int]
+        shapes of the tensors to contract
+    optimize : str, default is 'auto'
+        opt_einsum path optimizer
+    """
+    return oe.contract_expression(equation, *shapes, optimize=optimize)
+
 
 class BlockTT(TensorizedTensor, name='BlockTT'):
+    """Tensorized tensor in the Block Tensor-Train (a.k.a. TT-matrix) format
+
+    Notes
+    -----
+    The reconstruction (and indexing that requires forming a dense result) is done
+    in a single contraction of all the factors. Optionally, this contraction can be
+    compiled with ``torch.compile`` (requires PyTorch >= 2.0), with::
+
+        tltorch.set_block_tt_compile(True)
+
+    This is disabled by default, as compilation has a significant upfront cost
+    and is only worth it for large tensors used repeatedly.
+    """
     def __init__(self, factors, tensorized_shape=None, rank=None):
         super().__init__()
         self.shape = tensorized_shape_to_shape(tensorized_shape)
@@ -261,21 +433,19 @@ class BlockTT(TensorizedTensor, name='BlockTT'):
         self.rank = rank
         self.order = len(self.shape)
         self.factors = FactorList(factors)
+        # Built on the first call to to_tensor, so views created when indexing do not pay for it
+        self._to_tensor_equation = None
 
     @classmethod
     def new(cls, tensorized_shape, rank, device=None, dtype=None, **kwargs):
-        if all(isinstance(s, int) for s in tensorized_shape):
+        if not is_tensorized_shape(tensorized_shape):
             warnings.warn(f'Given a "flat" shape {tensorized_shape}. '
                           'This will be considered as the shape of a tensorized vector. '
                           'If you just want a 1D tensor, use a regular Tensor-Train. ')
-            ndim = 1
-            factor_shapes = [tensorized_shape]
             tensorized_shape = (tensorized_shape,)
-        else:
-            ndim = max([1 if isinstance(s, int) else len(s) for s in tensorized_shape])
-            factor_shapes = [(s, )*ndim if isinstance(s, int) else s for s in tensorized_shape]
-        
-        rank = validate_block_tt_rank(tensorized_shape, rank)
+
+        factor_shapes = _block_tt_mode_shapes(tensorized_shape)
+        rank = validate_block_tt_rank(tensorized_shape, rank, mode_shapes=factor_shapes)
         factor_shapes = [rank[:-1]] + factor_shapes + [rank[1:]]
         factor_shapes = list(zip(*factor_shapes))
         factors = [nn.Parameter(torch.empty(s, device=device, dtype=dtype)) for s in factor_shapes]
@@ -287,40 +457,21 @@ class BlockTT(TensorizedTensor, name='BlockTT'):
         return self.factors
 
     def to_tensor(self):
-        start = ord('d')
-        in1_eq = []
-        in2_eq = []
-        out_eq = []
-        for i, s in enumerate(self.tensorized_shape):
-            in1_eq.append(start+i)
-            if isinstance(s, int):
-                in2_eq.append(start+i)
-                out_eq.append(start+i)
-            else:
-                in2_eq.append(start+self.order+i)
-                out_eq.append(start+i)
-                out_eq.append(start+self.order+i)
-        in1_eq = ''.join(chr(i) for i in in1_eq)
-        in2_eq = ''.join(chr(i) for i in in2_eq)
-        out_eq = ''.join(chr(i) for i in out_eq)
-        equation = f'a{in1_eq}b,b{in2_eq}c->a{out_eq}c'
-        
-        for i, factor in enumerate(self.factors):
-            if not i:
-                res = factor
-            else:
-                out_shape = list(res.shape)
-                for i, s in enumerate(self.tensorized_shape):
-                    if not isinstance(s, int):
-                        out_shape[i+1] *= factor.shape[i+1]
-                out_shape[-1] = factor.shape[-1]
-                res = tl.reshape(tl.einsum(equation, res, factor), out_shape)
-
-        return tl.reshape(res.squeeze(0).squeeze(-1), self.tensor_shape)
+        factors = self._factors_list
+        if self._to_tensor_equation is None:
+            # The full reconstruction only depends on the structure of the factors
+            contraction_op = ['b' if isinstance(s, int) else 'm' for s in self.tensorized_shape]
+            self._to_tensor_equation = _block_tt_equation(len(factors), contraction_op)
+        if _COMPILE_ENABLED:
+            expression = _compile_contraction(self._to_tensor_equation)
+        else:
+            expression = _contract_expression(self._to_tensor_equation, tuple(f.shape for f in factors),
+                                              optimize='auto-hq')
+        return expression(*factors).reshape(self.tensor_shape)
 
     def __getitem__(self, indices):
-        factors = self.factors
-        if not isinstance(indices, Iterable):
+        factors = self._factors_list
+        if not isinstance(indices, _INDEX_ITER_TYPES):
             indices = [indices]
 
         if len(indices) < self.ndim:
@@ -331,95 +482,84 @@ class BlockTT(TensorizedTensor, name='BlockTT'):
 
         output_shape = []
         indexed_factors = []
-        ndim = len(self.factors)
+        ndim = len(factors)
         indexed_ndim = len(indices)
 
         contract_factors = False # If True, the result is dense, we need to form the full result
         contraction_op = [] # Whether the operation is batched or not
-        eq_in1 = 'a' # Previously contracted factors (rank_0, dim_0, ..., dim_N, rank_k)
-        eq_in2 = 'b' # Current factor (rank_k, dim_0', ..., dim_N', rank_{k+1})
-        eq_out = 'a' # Output contracted factor (rank_0, dim_0", ..., dim_N", rank_{k_1})
-        # where either:
-        #     i. dim_k" = dim_k' = dim_k (contraction_op='b' for batched)
-        # or ii. dim_k" = dim_k' x dim_k (contraction_op='m' for multiply)
-        
-        idx = ord('d') # Current character we can use for contraction
-        
+        # For each remaining dimension of the factors, either:
+        #     i. the dimension is shared by all the factors (contraction_op='b' for batched)
+        # or ii. the output dimension is the product of the factors' ones (contraction_op='m' for multiply)
+
         pad = (slice(None), ) # index previous dimensions with [:], to avoid using .take(dim=k)
         add_pad = False       # whether to increment the padding post indexing
         
-        for (index, shape) in zip(indices, self.tensorized_shape):
+        for (index, shape, strides) in zip(indices, self.tensorized_shape, self._tensorized_strides):
+            index = _scalar_index(index)
             if isinstance(shape, int):
                 # We are indexing a "batched" mode, not a tensorized one            
                 if not isinstance(index, (np.integer, int)):
                     if isinstance(index, slice):
-                        index = list(range(*index.indices(shape)))
-
-                    output_shape.append(len(index))
+                        # Slices are kept as is: indexing returns a view, no gather needed
+                        output_shape.append(len(range(*index.indices(shape))))
+                    else:
+                        output_shape.append(len(index))
                     add_pad = True
                     contraction_op += 'b' # batched
-                    eq_in1 += chr(idx); eq_in2 += chr(idx); eq_out += chr(idx)
-                    idx += 1
                 # else: we've essentially removed a mode of each factor
                 index = [index]*ndim
             else: 
                 # We are indexing a tensorized mode
 
-                if index == slice(None) or index == ():
+                if (isinstance(index, slice) and index == slice(None)) or (isinstance(index, tuple) and not index):
                     # Keeping all indices (:)
                     output_shape.append(shape)
-
-                    eq_in1 += chr(idx)
-                    eq_in2 += chr(idx+1)
-                    eq_out += chr(idx) + chr(idx+1)
-                    idx += 2
                     add_pad = True
-                    index = [index]*ndim
+                    index = None # Nothing to index in the factors
                     contraction_op += 'm' # multiply
                 else:
                     contract_factors = True
 
                     if isinstance(index, slice):
                         # Since we've already filtered out :, this is a partial slice
-                        # Convert into list
+                        # Convert into a tensor of indices
                         max_index = math.prod(shape)
-                        index = list(range(*index.indices(max_index)))
+                        index = torch.arange(*index.indices(max_index), device=factors[0].device)
 
-                    if isinstance(index, Iterable):
+                    if not isinstance(index, (np.integer, int)):
                         output_shape.append(len(index))
-                        contraction_op += 'b' # multiply
-                        eq_in1 += chr(idx)
-                        eq_in2 += chr(idx)
-                        eq_out += chr(idx)
-                        idx += 1
+                        contraction_op += 'b' # batched
                         add_pad = True
 
-                    index = np.unravel_index(index, shape)
+                    index = _unravel_index(index, shape, strides, device=factors[0].device)
 
             # Index the whole tensorized shape, resulting in a single factor
-            factors = [ff[pad + (idx,)] for (ff, idx) in zip(factors, index)]# + factors[indexed_ndim:]
+            if index is not None:
+                factors = [ff.index_select(len(pad), idx) if torch.is_tensor(idx) else ff[pad + (idx,)]
+                           for (ff, idx) in zip(factors, index)]# + factors[indexed_ndim:]
             if add_pad:
                 pad += (slice(None), )
                 add_pad = False
                 
 #         output_shape.extend(self.tensorized_shape[indexed_ndim:])
 
-        if contract_factors:
-            eq_in2 += 'c'
-            eq_in1 += 'b'
-            eq_out += 'c'
-            eq = eq_in1 + ',' + eq_in2 + '->' + eq_out
-            for i, factor in enumerate(factors):
-                if not i:
-                    res = factor
-                else:
-                    out_shape = list(res.shape)
-                    for j, s in enumerate(factor.shape[1:-1]):
-                        if contraction_op[j] == 'm':
-                            out_shape[j+1] *= s
-                    out_shape[-1] = factor.shape[-1] # Last rank
-                    res = tl.reshape(tl.einsum(eq, res, factor), out_shape)
-            return res.squeeze()
+        if contract_factors and 'm' not in contraction_op:
+            # Only batched dimensions: a chain of (batched) matrix products over the ranks
+            # Each factor is (rank_k, *output_shape, rank_{k+1}), viewed as a batch of (rank_k, rank_{k+1}) matrices
+            n_batch = math.prod(output_shape)
+            res = factors[0].reshape(factors[0].shape[0], n_batch, factors[0].shape[-1]).transpose(0, 1)
+            for factor in factors[1:]:
+                res = torch.bmm(res, factor.reshape(factor.shape[0], n_batch, factor.shape[-1]).transpose(0, 1))
+            return res.reshape(output_shape)
+
+        elif contract_factors:
+            eq = _block_tt_equation(ndim, contraction_op)
+
+            if _COMPILE_ENABLED:
+                expression = _compile_contraction(eq)
+            else:
+                expression = _contract_expression(eq, tuple(f.shape for f in factors))
+            return expression(*factors).reshape(tensorized_shape_to_shape(output_shape))
         else:
             return self.__class__(factors, output_shape, self.rank)
 
@@ -427,7 +567,7 @@ class BlockTT(TensorizedTensor, name='BlockTT'):
         if mean != 0:
             raise ValueError(f'Currently only mean=0 is supported, but got mean={mean}')
             
-        r = np.prod(self.rank)
+        r = math.prod(self.rank)
         std_factors = (std/r)**(1/self.order)
 
         with torch.no_grad():
@@ -6,6 +6,7 @@ from torch import testing
 
 from tltorch.factorized_tensors.tensorized_matrices import CPTensorized, TuckerTensorized, BlockTT
 from tltorch.factorized_tensors.core import TensorizedTensor
+from tltorch.utils.parameter_list import FactorList
 
 from ..factorized_tensors import FactorizedTensor, CPTensor, TuckerTensor, TTTensor
 
@@ -77,8 +78,37 @@ def test_TensorizedMatrix(factorization, batch_size):
         np.s_[:, :], # = (slice(None), slice(None))
         np.s_[:, 2],
         np.s_[2, 3],
-        np.s_[1, :]
+        np.s_[1, :],
+        np.array([1, 2]),
+        torch.tensor([1, 2]) # a single tensor only indexes the first mode
     ]
+    # Slices, ranges, lists and arrays of indices of the row and column modes
+    empty = torch.tensor([], dtype=torch.long)
+    matrix_indices = [
+        np.s_[2:5, :],
+        np.s_[[0, 3, 5], :],
+        np.s_[:, 3:7],
+        np.s_[[1], 2], # dimensions of size 1 are kept
+        np.s_[[1], :],
+        np.s_[3:4, [0, 2]],
+        np.s_[:, [7]],
+        np.s_[-1, :], # negative indices are counted from the end
+        np.s_[[-1, -24], :],
+        np.s_[empty, 3],
+        np.s_[2, empty],
+        np.s_[empty, :],
+        np.s_[[], 1],
+        np.s_[range(2), 1],
+        np.s_[np.array([1, 2]), 3],
+        np.s_[np.int64(5), 3],
+        np.s_[torch.tensor(3), 2],
+        np.s_[np.array(2), torch.tensor(3)]
+    ]
+    if batch_size:
+        indices += [(slice(None), ) + idx for idx in matrix_indices]
+        indices.append(np.s_[1:3, 2, [3, 4]])
+    else:
+        indices += matrix_indices
     for idx in indices:
         assert tuple(reconstruction[idx].shape) == tuple(fact_tensor[idx].shape)
         res = fact_tensor[idx]
@@ -86,6 +116,52 @@ def test_TensorizedMatrix(factorization, batch_size):
             res = res.to_matrix()
         testing.assert_allclose(reconstruction[idx], res)
 
+    if factorization == 'CP':
+        # Indexing every mode with : returns the tensor itself
+        assert fact_tensor[np.s_[:, :]] is fact_tensor
+
+
+@pytest.mark.parametrize('factorization', ['BlockTT', 'CP'])
+def test_TensorizedMatrix_out_of_bounds(factorization):
+    """Test that out of bounds indices of a tensorized mode raise instead of wrapping around"""
+    fact_tensor = TensorizedTensor.new(((4, 3, 2), (5, 3, 2)), rank=0.5, factorization=factorization)
+    fact_tensor.normal_()
+
+    for idx in [np.s_[24], np.s_[-25], np.s_[[24], :], np.s_[[0, -25], :], np.s_[:, [30]]]:
+        with pytest.raises((IndexError, RuntimeError)):
+            fact_tensor[idx]
+
+    with pytest.raises((IndexError, RuntimeError)):
+        fact_tensor[torch.tensor([24]), :]
+
+
+@pytest.mark.parametrize('factorization', ['BlockTT', 'CP', 'Tucker'])
+def test_TensorizedMatrix_updated_factors(factorization):
+    """Test that indexing and reconstruction use the current factors after they are modified"""
+    tensor_shape = ((4, 3, 2), (5, 3, 2))
+    fact_tensor = TensorizedTensor.new(tensor_shape, rank=0.5, factorization=factorization)
+    fact_tensor.normal_()
+
+    # Reassigning a single factor
+    fact_tensor.factors[0] = torch.nn.Parameter(torch.zeros_like(fact_tensor.factors[0]))
+    testing.assert_allclose(fact_tensor.to_matrix(), torch.zeros(fact_tensor.shape))
+
+    # Converting the parameters
+    fact_tensor = fact_tensor.to(torch.float64)
+    assert fact_tensor.to_tensor().dtype == torch.float64
+
+    # Replacing all the factors, then loading the remaining parameters (e.g. the CP weights)
+    new_tensor = TensorizedTensor.new(tensor_shape, rank=0.5, factorization=factorization,
+                                      dtype=torch.float64)
+    new_tensor.normal_()
+    fact_tensor.factors = FactorList([torch.nn.Parameter(f.detach().clone()) for f in new_tensor.factors])
+    fact_tensor.load_state_dict(new_tensor.state_dict())
+    testing.assert_allclose(fact_tensor.to_matrix(), new_tensor.to_matrix())
+    res = fact_tensor[1, :]
+    if not torch.is_tensor(res):
+        res = res.to_matrix()
+    testing.assert_allclose(res, new_tensor.to_matrix()[1, :])
+
 
 @pytest.mark.parametrize('factorization', ['CP', 'TT'])
 def test_transduction(factorization):